@@ -1,10 +1,20 @@
+import asyncio
+import atexit
+import functools
+import logging
 import os
 import random
+import re
+import shelve
+import threading
+import time
+from collections import OrderedDict
 
-import aisuite as ai
-import gradio as gr
+import orjson
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # =====================================================
 # 0) Load API key from .env
 # =====================================================
@@ -16,145 +26,409 @@ if not api_key:
         "Make sure .env is in the same folder and contains:\n"
         "GROQ_API_KEY=your_key_here"
     )
-os.environ["GROQ_API_KEY"] = api_key
 
 # =====================================================
 # 1) Model setup (Groq)
 # =====================================================
-client = ai.Client()
-PROVIDER = "groq"
 MODEL = "llama-3.1-8b-instant"   # gemma2-9b-it is decommissioned
+MAX_CONCURRENT_REQUESTS = 32     # in-flight Groq calls shared by all sessions
+# Reasons (~300 tokens) + recommendation (~500 tokens) in one fused reply
+GENERATION_PARAMS = {"max_tokens": 800, "temperature": 0.3, "top_p": 0.9}
+groq_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# One pooled HTTP/2 client so TLS sessions are reused across calls.
+# Created on first use to keep httpx off the import path.
+@functools.lru_cache(maxsize=None)
+def get_http_client():
+    import httpx
+
+    http_client = httpx.AsyncClient(
+        base_url="https://api.groq.com/openai/v1",
+        headers={"Authorization": f"Bearer {api_key}"},
+        http2=True,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=MAX_CONCURRENT_REQUESTS, max_connections=64),
+    )
+    # Not closed explicitly: its connections belong to Gradio's event loop,
+    # which is gone by atexit time; process exit closes the sockets.
+    return http_client
 
 # =====================================================
 # 2) Preset question buttons
 # =====================================================
+# Immutable per-topic tuples; pick_topic indexes them directly
 QUESTION_SETS = {
-    "Funds": [
+    "Funds": (
         "What is an index fund?",
         "Are funds suitable for long-term investing?",
         "How should a beginner choose a suitable fund?"
-    ],
-    "Bonds": [
+    ),
+    "Bonds": (
         "Is now a good time to invest in bonds?",
         "Are bonds less risky than stocks?",
         "What types of bonds are suitable for conservative investors?"
-    ],
-    "Foreign Currency": [
+    ),
+    "Foreign Currency": (
         "Which is better: USD time deposit or USD bonds?",
         "Can I invest in funds using foreign currency?",
         "Will FX volatility affect foreign-currency funds?"
-    ],
-    "Macro": [
+    ),
+    "Macro": (
         "With current economic uncertainty, how should I allocate assets?",
         "What investment themes are worth watching right now?",
         "Will inflation continue? How should I respond?"
-    ]
+    ),
 }
 
 # =====================================================
 # 3) LLM helper
 # =====================================================
-def call_llm(messages):
-    resp = client.chat.completions.create(
-        model=f"{PROVIDER}:{MODEL}",
-        messages=messages,
-    )
-    return resp.choices[0].message.content.strip()
+def groq_error_message(error) -> str:
+    # Groq errors look like {"message": ..., "type": ...}
+    if isinstance(error, dict):
+        return error.get("message") or str(error)
+    return str(error)
 
-def generate_reasons(question: str) -> str:
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a financial education assistant.\n"
-                "Based on the user's question, list FIVE clear and constructive reasons explaining why, "
-                "in this scenario, it may make sense to consider funds or bonds (non-trading products).\n"
-                "Rewrite the user's question as a title, then respond in bullet points.\n"
-                "Rules:\n"
-                "- Educational only\n"
-                "- No buy/sell instructions\n"
-            ),
-        },
-        {"role": "user", "content": question},
-    ]
-    return call_llm(messages)
+async def call_llm_stream(messages):
+    # Yields (token, finish_reason); finish_reason is None until the last chunk
+    payload = {
+        "model": MODEL,
+        "messages": messages,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+        **GENERATION_PARAMS,
+    }
+    async with groq_slots:
+        async with get_http_client().stream(
+            "POST",
+            "/chat/completions",
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        ) as resp:
+            if resp.is_error:
+                # Streamed bodies are not read yet; load it to surface Groq's message
+                await resp.aread()
+                try:
+                    error = orjson.loads(resp.content).get("error")
+                except (orjson.JSONDecodeError, AttributeError):
+                    error = None
+                detail = groq_error_message(error) if error else resp.text
+                raise RuntimeError(f"Groq API error {resp.status_code}: {detail}")
+            # Server-sent events: "data: {json}" lines, terminated by "data: [DONE]"
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                chunk = orjson.loads(data)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Groq API error: {groq_error_message(chunk['error'])}")
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+                    logger.info(
+                        "Groq usage: prompt=%d completion=%d tokens",
+                        usage["prompt_tokens"], usage["completion_tokens"],
+                    )
+                if chunk.get("choices"):
+                    choice = chunk["choices"][0]
+                    yield choice["delta"].get("content") or "", choice.get("finish_reason")
+
+# Intents in priority order: the first one with a keyword hit wins
+INTENT_KEYWORDS = {
+    "Knowledge": ["what is", "define", "definition", "difference", "compare", "vs", "versus"],
+    "Advice": ["how to invest", "recommend", "suggest", "what should i buy", "i want to invest"],
+    "Personalized": ["is it suitable", "for me", "my situation", "i have", "my current"],
+}
+# One named group per intent, read back via m.lastgroup: with IGNORECASE the
+# matched text may differ from the key (e.g. "İ", "ſ"), so it is never looked up.
+# The lookahead reports overlapping keywords in one scan; the leading \b stops
+# short keys like "vs" matching inside words, while no trailing \b keeps
+# "recommended" / "suggestions" matching.
+KEYWORD_RE = re.compile(
+    r"(?=\b(?:"
+    + "|".join(
+        f"(?P<{intent}>" + "|".join(re.escape(k) for k in keys) + ")"
+        for intent, keys in INTENT_KEYWORDS.items()
+    )
+    + "))",
+    re.IGNORECASE,
+)
 
 def classify_question(question: str) -> str:
-    q = question.lower()
-    if any(k in q for k in ["what is", "define", "definition", "difference", "compare", "vs", "versus"]):
-        return "Knowledge"
-    if any(k in q for k in ["how to invest", "recommend", "suggest", "what should i buy", "i want to invest"]):
-        return "Advice"
-    if any(k in q for k in ["is it suitable", "for me", "my situation", "i have", "my current"]):
-        return "Personalized"
+    hits = {m.lastgroup for m in KEYWORD_RE.finditer(question)}
+    for intent in INTENT_KEYWORDS:
+        if intent in hits:
+            return intent
     return "Mixed"
 
-def generate_advice(reasons: str, qtype: str) -> str:
+# Bump when the prompt or GENERATION_PARAMS change so cached answers expire
+PROMPT_VERSION = 2
+
+REASONS_HEADER = "### SECTION 1: REASONS"
+ADVICE_HEADER = "### SECTION 2: RECOMMENDATION"
+# The model does not always echo the headers verbatim (case, "##", "**"), so
+# match a line starting with "section N" behind header markup only; bullets
+# such as "- Section 2 of the act" are left alone.
+REASONS_HEADER_RE = re.compile(r"(?im)^[ \t]*(?:#+|\*\*)?[ \t]*section 1\b[^\n]*$")
+ADVICE_HEADER_RE = re.compile(r"(?im)^[ \t]*(?:#+|\*\*)?[ \t]*section 2\b[^\n]*$")
+
+def build_messages(question: str, qtype: str) -> list:
     if qtype == "Knowledge":
-        system_prompt = (
-            "You are a financial education expert.\n"
-            "Use the CONTEXT below.\n"
+        advice_rules = (
             "Explain in 3 bullet points, then add 1 sentence relating it to funds or bonds.\n"
             "End with: Educational use only."
         )
     elif qtype == "Personalized":
-        system_prompt = (
-            "You are a financial educator.\n"
-            "Use the CONTEXT below.\n"
+        advice_rules = (
             "Provide 3 example allocations (percentages): Conservative / Balanced / Aggressive.\n"
             "Explain who each fits. No buy/sell instructions.\n"
             "End with: Not financial advice."
         )
     else:
-        system_prompt = (
-            "You are a professional investment educator.\n"
-            "Use the CONTEXT below to give constructive guidance.\n"
+        advice_rules = (
+            "Give constructive guidance based on the reasons above.\n"
             "Include asset direction + example allocation ratios + suitable profiles.\n"
             "End with: Educational use only."
         )
 
-    messages = [
-        {"role": "system", "content": system_prompt + "\n\nCONTEXT:\n" + reasons}
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a financial education assistant.\n"
+                "Answer in exactly two sections, each starting with its header line verbatim.\n\n"
+                f"{REASONS_HEADER}\n"
+                "Rewrite the user's question as a title, then list FIVE clear and constructive reasons "
+                "in bullet points explaining why, in this scenario, it may make sense to consider "
+                "funds or bonds (non-trading products).\n\n"
+                f"{ADVICE_HEADER} ({qtype})\n"
+                "Using the reasons from section 1:\n"
+                f"{advice_rules}\n\n"
+                "Rules:\n"
+                "- Educational only\n"
+                "- No buy/sell instructions\n"
+            ),
+        },
+        {"role": "user", "content": question},
     ]
-    return call_llm(messages)
+
+def split_sections(text: str) -> tuple:
+    # Model output -> (reasons, advice); tolerate a missing second header
+    parts = ADVICE_HEADER_RE.split(text, maxsplit=1)
+    reasons = REASONS_HEADER_RE.sub("", parts[0], count=1).strip()
+    advice = parts[1].strip() if len(parts) > 1 else ""
+    return reasons, advice
+
+def render_answer(reasons: str, advice: str, qtype: str) -> str:
+    return (
+        f"### 🤖 Investment Reasons\n\n"
+        f"{reasons}\n\n"
+        f"---\n\n"
+        f"### ✅ Recommendation ({qtype})\n\n"
+        f"{advice}\n\n"
+        f"> Educational only — not financial advice."
+    )
+
+# =====================================================
+# 3b) Response cache (exact + optional semantic tier)
+# =====================================================
+# Next to the script, like .env, so the cache does not depend on the cwd
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "responses")
+CACHE_MAX_ENTRIES = 512
+SIMILARITY_THRESHOLD = 0.92
+# "model|prompt version|qtype|normalized question" -> (reasons, advice)
+CACHE_NAMESPACE = f"{MODEL}|{PROMPT_VERSION}|"
+
+# Least recently used first; restored in arbitrary order after a restart
+_cache_order = OrderedDict()
+
+# Semantic tier: one unit-embedding row per cache key. The key list and matrix
+# are replaced, never mutated, so worker threads can score a snapshot.
+# _cache_lock guards them together with _cache_order and embedder.
+embedder = None   # set by load_embedder(); exact-match cache only until then
+_semantic_keys = []
+_semantic_matrix = None
+_cache_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache():
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    shelf = shelve.open(CACHE_PATH)
+    atexit.register(shelf.close)
+    # Drop answers produced by another model or prompt version
+    for stale in [k for k in shelf.keys() if not k.startswith(CACHE_NAMESPACE)]:
+        del shelf[stale]
+    with _cache_lock:
+        _cache_order.update(OrderedDict.fromkeys(shelf.keys()))
+    return shelf
+
+def normalize_question(question: str) -> str:
+    q = re.sub(r"[^\w\s]", "", question.lower().strip())
+    return " ".join(q.split())
+
+def cache_key(text: str, qtype: str) -> str:
+    return f"{CACHE_NAMESPACE}{qtype}|{text}"
+
+def _append_rows(keys: list, rows) -> None:
+    # Caller holds _cache_lock
+    global _semantic_keys, _semantic_matrix
+    import numpy as np
+
+    _semantic_matrix = rows if _semantic_matrix is None else np.vstack([_semantic_matrix, rows])
+    _semantic_keys = _semantic_keys + keys
+
+def _remove_row(key: str) -> None:
+    # Caller holds _cache_lock
+    global _semantic_keys, _semantic_matrix
+    if key not in _semantic_keys:
+        return
+    import numpy as np
+
+    row = _semantic_keys.index(key)
+    _semantic_keys = _semantic_keys[:row] + _semantic_keys[row + 1:]
+    _semantic_matrix = np.delete(_semantic_matrix, row, axis=0) if _semantic_keys else None
+
+def _index_missing(model) -> None:
+    # Embed cached questions that have no row yet: persisted from an earlier
+    # run, or stored while the model was loading. Encoding runs unlocked.
+    with _cache_lock:
+        indexed = set(_semantic_keys)
+        missing = [k for k in _cache_order if k not in indexed]
+    if not missing:
+        return
+    vectors = model.encode([k.rsplit("|", 1)[1] for k in missing], normalize_embeddings=True)
+    with _cache_lock:
+        # Skip keys evicted or indexed by another thread in the meantime
+        indexed = set(_semantic_keys)
+        keep = [i for i, k in enumerate(missing) if k in _cache_order and k not in indexed]
+        if keep:
+            _append_rows([missing[i] for i in keep], vectors[keep])
+
+def load_embedder() -> None:
+    # sentence-transformers pulls in torch, so it is loaded in the background
+    global embedder
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer("all-MiniLM-L6-v2", device="cpu")
+        _index_missing(model)
+    except ImportError:
+        return
+    except Exception:
+        logger.exception("Could not load the embedding model; semantic cache disabled")
+        return
+    with _cache_lock:
+        embedder = model
+
+def semantic_match(text: str, qtype: str) -> tuple:
+    # Runs in a worker thread: returns (closest cache key or None, query vector)
+    with _cache_lock:
+        model = embedder
+    if model is None:
+        return None, None
+    _index_missing(model)
+    vector = model.encode(text, normalize_embeddings=True)
+    with _cache_lock:
+        keys, matrix = _semantic_keys, _semantic_matrix
+    if matrix is None:
+        return None, vector
+
+    prefix = cache_key("", qtype)
+    best_key, best_sim = None, SIMILARITY_THRESHOLD
+    for key, sim in zip(keys, matrix @ vector):
+        if key.startswith(prefix) and sim >= best_sim:
+            best_key, best_sim = key, sim
+    return best_key, vector
+
+def cache_get(key: str):
+    shelf = get_response_cache()
+    with _cache_lock:
+        if key not in _cache_order:
+            return None
+        _cache_order.move_to_end(key)
+    return shelf[key]
+
+def cache_store(key: str, result: tuple, vector=None) -> None:
+    shelf = get_response_cache()
+    shelf[key] = result
+    evicted = []
+    with _cache_lock:
+        _cache_order[key] = None
+        _cache_order.move_to_end(key)
+        # Without a vector the key is indexed by the next semantic_match
+        if vector is not None and key not in _semantic_keys:
+            _append_rows([key], vector.reshape(1, -1))
+        while len(_cache_order) > CACHE_MAX_ENTRIES:
+            oldest, _ = _cache_order.popitem(last=False)
+            _remove_row(oldest)
+            evicted.append(oldest)
+    for oldest in evicted:
+        del shelf[oldest]
 
 # =====================================================
 # 4) Chat handler (Gradio 6.x: messages format)
 # =====================================================
-def on_send(user_text, messages_state):
-    user_text = (user_text or "").strip()
-    if not user_text:
-        return "", messages_state
+STREAM_UPDATE_INTERVAL = 0.05   # seconds between UI updates (<= 20 Hz)
 
+async def on_send(user_text, messages_state):
+    user_text = (user_text or "").strip()
     messages_state = messages_state or []
+    if not user_text:
+        yield "", messages_state
+        return
 
-    # Add user message
+    # Add user message + placeholder for the streamed answer
     messages_state.append({"role": "user", "content": user_text})
+    messages_state.append({"role": "assistant", "content": ""})
 
     try:
-        reasons = generate_reasons(user_text)
         qtype = classify_question(user_text)
-        advice = generate_advice(reasons, qtype)
-
-        assistant_html = (
-            f"### 🤖 Investment Reasons\n\n"
-            f"{reasons}\n\n"
-            f"---\n\n"
-            f"### ✅ Recommendation ({qtype})\n\n"
-            f"{advice}\n\n"
-            f"> Educational only — not financial advice."
-        )
+        text = normalize_question(user_text)
+        key = cache_key(text, qtype)
 
+        cached, vector = cache_get(key), None
+        if cached is None:
+            # Embedding is CPU work; keep it off the event loop
+            match, vector = await asyncio.to_thread(semantic_match, text, qtype)
+            if match is not None:
+                cached = cache_get(match)
+        if cached is not None:
+            messages_state[-1] = {"role": "assistant", "content": render_answer(*cached, qtype)}
+            yield "", messages_state
+            return
 
-        messages_state.append({"role": "assistant", "content": assistant_html})
-        return "", messages_state
+        # Re-render at most every STREAM_UPDATE_INTERVAL seconds; a yield per
+        # token makes the Chatbot re-render hundreds of times a second.
+        partial, finish_reason = "", None
+        last_yield = time.monotonic()
+        async for token, reason in call_llm_stream(build_messages(user_text, qtype)):
+            partial += token
+            finish_reason = reason or finish_reason
+            now = time.monotonic()
+            if now - last_yield < STREAM_UPDATE_INTERVAL:
+                continue
+            last_yield = now
+            reasons, advice = split_sections(partial)
+            messages_state[-1] = {"role": "assistant", "content": render_answer(reasons, advice, qtype)}
+            yield "", messages_state
+
+        result = split_sections(partial.strip())
+        messages_state[-1] = {"role": "assistant", "content": render_answer(*result, qtype)}
+        # Never persist truncated or unparseable answers
+        if all(result) and finish_reason == "stop":
+            cache_store(key, result, vector)
+        yield "", messages_state
 
     except Exception as e:
-        messages_state.append({"role": "assistant", "content": f"❌ Error: {e}"})
-        return "", messages_state
+        messages_state[-1] = {"role": "assistant", "content": f"❌ Error: {e}"}
+        yield "", messages_state
+
+topic_rng = random.Random()
 
 def pick_topic(topic: str) -> str:
-    return random.choice(QUESTION_SETS[topic])
+    questions = QUESTION_SETS[topic]
+    return questions[topic_rng.randrange(len(questions))]
 
 # =====================================================
 # 5) UI (theme/css must be passed to launch in Gradio 6+)
@@ -169,53 +443,72 @@ CSS = """
 }
 """
 
-with gr.Blocks() as demo:
-    gr.Markdown("""
-    <div style="text-align:center;">
-      <h2>AI Investment Helper</h2>
-      <p>Ask one question to learn directions for funds and bonds (educational only)</p>
-    </div>
-    """)
-
-    chatbot = gr.Chatbot(height=420)   # expects messages list in Gradio 6.x
-    state = gr.State([])              # keep messages here
-
-    user_box = gr.Textbox(placeholder="Type your investment question here...", lines=2)
-    send_btn = gr.Button("🚀 Submit")
-
-    gr.Markdown("<hr><p style='text-align:center'>📌 <b>Not sure what to ask? Start with a topic:</b></p>")
-    with gr.Row():
-        fund_btn = gr.Button("📈 Funds", elem_classes="circle-btn")
-        bond_btn = gr.Button("🧾 Bonds", elem_classes="circle-btn")
-        fx_btn = gr.Button("💱 Foreign Currency", elem_classes="circle-btn")
-        macro_btn = gr.Button("📊 Macro / Market", elem_classes="circle-btn")
-
-    # Send flow
-    send_btn.click(fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]).then(
-        fn=lambda x: x, inputs=[chatbot], outputs=[state]
-    )
+def build_ui():
+    import gradio as gr
+
+    with gr.Blocks() as demo:
+        gr.Markdown("""
+        <div style="text-align:center;">
+          <h2>AI Investment Helper</h2>
+          <p>Ask one question to learn directions for funds and bonds (educational only)</p>
+        </div>
+        """)
 
-    # Topic buttons: put text -> send -> sync state
-    fund_btn.click(fn=lambda: pick_topic("Funds"), inputs=[], outputs=[user_box]).then(
-        fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
-    ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+        chatbot = gr.Chatbot(height=420)   # expects messages list in Gradio 6.x
+        state = gr.State([])              # keep messages here
 
-    bond_btn.click(fn=lambda: pick_topic("Bonds"), inputs=[], outputs=[user_box]).then(
-        fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
-    ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+        user_box = gr.Textbox(placeholder="Type your investment question here...", lines=2)
+        send_btn = gr.Button("🚀 Submit")
 
-    fx_btn.click(fn=lambda: pick_topic("Foreign Currency"), inputs=[], outputs=[user_box]).then(
-        fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
-    ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+        gr.Markdown("<hr><p style='text-align:center'>📌 <b>Not sure what to ask? Start with a topic:</b></p>")
+        with gr.Row():
+            fund_btn = gr.Button("📈 Funds", elem_classes="circle-btn")
+            bond_btn = gr.Button("🧾 Bonds", elem_classes="circle-btn")
+            fx_btn = gr.Button("💱 Foreign Currency", elem_classes="circle-btn")
+            macro_btn = gr.Button("📊 Macro / Market", elem_classes="circle-btn")
 
-    macro_btn.click(fn=lambda: pick_topic("Macro"), inputs=[], outputs=[user_box]).then(
-        fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
-    ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+        # Send flow
+        send_btn.click(fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot], api_name="send").then(
+            fn=lambda x: x, inputs=[chatbot], outputs=[state]
+        )
+
+        # Topic buttons: put text -> send -> sync state
+        fund_btn.click(fn=lambda: pick_topic("Funds"), inputs=[], outputs=[user_box]).then(
+            fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
+        ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+
+        bond_btn.click(fn=lambda: pick_topic("Bonds"), inputs=[], outputs=[user_box]).then(
+            fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
+        ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+
+        fx_btn.click(fn=lambda: pick_topic("Foreign Currency"), inputs=[], outputs=[user_box]).then(
+            fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
+        ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
+
+        macro_btn.click(fn=lambda: pick_topic("Macro"), inputs=[], outputs=[user_box]).then(
+            fn=on_send, inputs=[user_box, state], outputs=[user_box, chatbot]
+        ).then(fn=lambda x: x, inputs=[chatbot], outputs=[state])
 
-    gr.Markdown("""
-    <div style="margin-top:20px; padding:10px; background:#f4f4f5; border-radius:10px;">
-      ⚠️ Educational only — not financial advice.
-    </div>
-    """)
+        gr.Markdown("""
+        <div style="margin-top:20px; padding:10px; background:#f4f4f5; border-radius:10px;">
+          ⚠️ Educational only — not financial advice.
+        </div>
+        """)
+
+    demo.queue(default_concurrency_limit=32)
+    return demo
+
+if __name__ == "__main__":
+    import gradio as gr
+
+    # LOG_LEVEL=WARNING hides the per-completion token usage lines
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per request otherwise
 
-demo.launch(server_name="127.0.0.1", server_port=7860, share=False, theme=gr.themes.Soft(), css=CSS)
+    get_response_cache()   # open + purge the persistent cache before serving
+    # Load the optional embedding model off the startup path
+    threading.Thread(target=load_embedder, daemon=True).start()
+    build_ui().launch(server_name="127.0.0.1", server_port=7860, share=False, theme=gr.themes.Soft(), css=CSS)
@@ -0,0 +1,18 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app():
+    # The module validates GROQ_API_KEY at import time
+    os.environ.setdefault("GROQ_API_KEY", "test-key")
+    sys.path.insert(0, ROOT)
+    try:
+        yield importlib.import_module("AiInvestmentHelper")
+    finally:
+        sys.path.remove(ROOT)
@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+
+def sse(*events):
+    return b"".join(b"data: " + orjson.dumps(e) + b"\n\n" for e in events) + b"data: [DONE]\n\n"
+
+
+def collect(app, monkeypatch, handler):
+    client = httpx.AsyncClient(base_url="https://groq.test", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(app, "get_http_client", lambda: client)
+
+    async def run():
+        return [item async for item in app.call_llm_stream([{"role": "user", "content": "hi"}])]
+
+    return asyncio.run(run())
+
+
+def test_yields_tokens_and_finish_reason(app, monkeypatch):
+    body = sse(
+        {"choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+        {"choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+        {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}},
+    )
+    items = collect(app, monkeypatch, lambda request: httpx.Response(200, content=body))
+    assert items == [("Hel", None), ("lo", "stop")]
+
+
+def test_http_error_includes_groq_message(app, monkeypatch):
+    body = {"error": {"message": "Rate limit reached", "type": "tokens"}}
+    with pytest.raises(RuntimeError, match="429: Rate limit reached"):
+        collect(app, monkeypatch, lambda request: httpx.Response(429, json=body))
+
+
+def test_http_error_without_json_body(app, monkeypatch):
+    with pytest.raises(RuntimeError, match="502: bad gateway"):
+        collect(app, monkeypatch, lambda request: httpx.Response(502, text="bad gateway"))
+
+
+def test_error_event_in_stream(app, monkeypatch):
+    body = sse(
+        {"choices": [{"delta": {"content": "Hi"}, "finish_reason": None}]},
+        {"error": {"message": "model overloaded"}},
+    )
+    with pytest.raises(RuntimeError, match="model overloaded"):
+        collect(app, monkeypatch, lambda request: httpx.Response(200, content=body))
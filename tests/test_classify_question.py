@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is an index fund?", "Knowledge"),
+    ("Can you recommend a fund?", "Advice"),
+    ("Is it suitable for me?", "Personalized"),
+    ("Will inflation continue?", "Mixed"),
+])
+def test_intents(app, question, expected):
+    assert app.classify_question(question) == expected
+
+
+def test_priority_not_position(app):
+    # Knowledge outranks Advice/Personalized wherever the keyword appears
+    assert app.classify_question("I have 10k, what should I buy? What is a bond?") == "Knowledge"
+    assert app.classify_question("I have savings, can you recommend something?") == "Advice"
+
+
+def test_word_start_boundary(app):
+    assert app.classify_question("USD deposit VS bonds") == "Knowledge"
+    assert app.classify_question("Do devs invest differently?") == "Mixed"
+    assert app.classify_question("Which funds are recommended?") == "Advice"
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("İ have 10k", "Personalized"),
+    ("What iſ a bond?", "Knowledge"),
+    ("Is it ſuitable for me", "Personalized"),
+    ("Qu'est-ce qu'une obligation ? 债券是什么", "Mixed"),
+])
+def test_non_ascii_input(app, question, expected):
+    assert app.classify_question(question) == expected
@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.parametrize("text", [
+    "### SECTION 1: REASONS\n- r\n### SECTION 2: RECOMMENDATION (Knowledge)\n- a",
+    "## section 1: reasons\n- r\n## section 2: recommendation\n- a",
+    "**Section 1: Reasons**\n- r\n**Section 2: Recommendation (Mixed)**\n- a",
+    "SECTION 1\n- r\n  SECTION 2\n- a",
+])
+def test_header_variants(app, text):
+    assert app.split_sections(text) == ("- r", "- a")
+
+
+def test_bullet_mentioning_section_is_not_a_header(app):
+    text = (
+        "### SECTION 1: REASONS\n"
+        "- Section 2 of the law says x\n"
+        "### SECTION 2: RECOMMENDATION\n"
+        "adv"
+    )
+    assert app.split_sections(text) == ("- Section 2 of the law says x", "adv")
+
+
+def test_missing_recommendation_header(app):
+    assert app.split_sections("### SECTION 1: REASONS\n- r") == ("- r", "")
+    assert app.split_sections("just text") == ("just text", "")
+
+
+def test_partial_header_while_streaming(app):
+    assert app.split_sections("### SECTION 1: REASONS\n- r\n### SECTION 2: RECOM") == ("- r", "")